@@ -6,9 +6,15 @@ Capabilities:
 - Call local LLM adapter to optimize resume/cover.
 - Attempt automated apply (Selenium) for simple forms, or queue for manual approval.
 - Track applications in local SQLite DB.
-- Check Gmail via IMAP and update status when company replies.
+- Watch Gmail via IMAP IDLE and update status when company replies.
 - Exposes a tiny Flask dashboard and endpoints to trigger runs.
 
+Running:
+- python3 app.py                 dashboard (dev server) + scheduler + Gmail watcher in one process
+- python3 app.py --run-once      one scrape/apply/email cycle, then exit (e.g. from cron)
+- production: gunicorn -c gunicorn.conf.py app:app for the dashboard, plus one
+  python3 app.py --no-server process for the scheduler and Gmail watcher
+
 Customize:
 - LOCAL_LLM_CALL: adapt to your local model API / function.
 - apply_to_job(): add site-specific selectors for structured apply flows.
@@ -20,14 +26,28 @@ IMPORTANT: Respect job board TOS and captcha systems. Use only on accounts you c
 import os
 import sqlite3
 import time
+import threading
+import hashlib
+import json
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import aiohttp
+from urllib.parse import urlparse
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 import requests
-from bs4 import BeautifulSoup
-from flask import Flask, jsonify, request, render_template_string
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import lxml.html
+from lxml import etree
+from flask import Flask, jsonify, request
 from dotenv import load_dotenv
+from diskcache import Cache
 from datetime import datetime, timedelta
 from imapclient import IMAPClient
+import ahocorasick
 import email
-from email.header import decode_header
+from email.header import decode_header, make_header
 from apscheduler.schedulers.background import BackgroundScheduler
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -45,10 +65,48 @@ JOB_ROLE = os.getenv("JOB_ROLE", "software engineer")
 SELENIUM_DRIVER_PATH = os.getenv("SELENIUM_DRIVER_PATH", "")  # if empty, require chromedriver in PATH
 APPLY_MODE = os.getenv("APPLY_MODE", "manual")  # "auto" or "manual"
 LOCAL_LLM_ENDPOINT = os.getenv("LOCAL_LLM_ENDPOINT", "")  # optional
+APPLY_WORKERS = int(os.getenv("APPLY_WORKERS", "8"))  # jobs processed in parallel per run
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "2"))  # in-flight requests to the local model
+LLM_STREAM = os.getenv("LLM_STREAM", "true").lower() in ("1", "true", "yes")  # ask the endpoint to stream tokens
+LLM_BATCH = os.getenv("LLM_BATCH", "false").lower() in ("1", "true", "yes")  # send all prompts of a run in one request
+RUN_LOCK_TTL = int(os.getenv("RUN_LOCK_TTL", "21600"))  # seconds before a crashed run's lock is ignored
+RUN_REQUEST_POLL = int(os.getenv("RUN_REQUEST_POLL", "5"))  # seconds between checks for dashboard run requests
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "./.llm_cache")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "604800"))  # seconds; one week
+
+# ---------- HTTP session ----------
+def build_session():
+    """
+    Shared requests session: pooled keep-alive connections (TLS/DNS paid once per host)
+    and urllib3 retries with exponential backoff that honour Retry-After on 429/503.
+    """
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+SESSION = build_session()
 
 # ---------- DB helpers ----------
+_local = threading.local()
+
+def db():
+    """
+    Per-thread SQLite connection, opened once and reused (sqlite3 caches prepared statements per connection).
+    Autocommit mode; WAL lets the dashboard read while a run is writing.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    return conn
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db()
     c = conn.cursor()
     c.execute("""CREATE TABLE IF NOT EXISTS jobs (
                  id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -70,154 +128,558 @@ def init_db():
                  attempt_time TEXT,
                  result TEXT
                  )""")
-    conn.commit()
-    conn.close()
+    c.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v TEXT)")
+    # status filters (run_full_cycle, Gmail matching) and the dashboard/applications ORDER BY ... LIMIT
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_posted ON jobs(posted_date DESC)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_apps_time ON applications(attempt_time DESC)")
 
-def add_or_update_job(job):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+def add_or_update_jobs(jobs):
+    """
+    Upsert a batch of scraped jobs in one transaction (one fsync per run rather than one per job).
+    Existing rows keep their status/notes; only the listing fields are refreshed.
+    """
+    if not jobs:
+        return
+    conn = db()
+    conn.execute("BEGIN")
     try:
-        c.execute("""
+        conn.executemany("""
             INSERT INTO jobs (job_id,title,company,location,url,posted_date,status,notes)
             VALUES (?,?,?,?,?,?,?,?)
-            """, (job['job_id'], job['title'], job['company'], job['location'], job['url'], job['posted_date'], job.get('status','new'), job.get('notes','')))
-        conn.commit()
-    except sqlite3.IntegrityError:
-        # already exists; update
-        c.execute("""UPDATE jobs SET title=?, company=?, location=?, url=?, posted_date=? WHERE job_id=?""",
-                  (job['title'], job['company'], job['location'], job['url'], job['posted_date'], job['job_id']))
-        conn.commit()
-    conn.close()
+            ON CONFLICT(job_id) DO UPDATE SET
+                title=excluded.title, company=excluded.company, location=excluded.location,
+                url=excluded.url, posted_date=excluded.posted_date
+            """, [(job['job_id'], job['title'], job['company'], job['location'], job['url'], job['posted_date'], job.get('status','new'), job.get('notes',''))
+                  for job in jobs])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    invalidate_dashboard()
+
+def kv_get(k, default=None):
+    row = db().execute("SELECT v FROM kv WHERE k=?", (k,)).fetchone()
+    return row[0] if row else default
+
+def kv_set(k, v):
+    db().execute("INSERT INTO kv (k,v) VALUES (?,?) ON CONFLICT(k) DO UPDATE SET v=excluded.v", (k, str(v)))
+
+def acquire_run_lock():
+    """
+    Claims the cross-process run lock (a kv row) so the scheduler process, web workers and --run-once
+    never run a cycle at the same time. Returns a token to release it with, or None if a run holds it.
+    A lock older than RUN_LOCK_TTL is taken over, in case its owner died mid-run.
+    """
+    now = time.time()
+    token = f"{now:.6f}:{os.getpid()}"
+    cur = db().execute("""
+        INSERT INTO kv (k,v) VALUES ('run_lock', ?)
+        ON CONFLICT(k) DO UPDATE SET v=excluded.v
+        WHERE kv.v = '' OR CAST(kv.v AS REAL) < ?
+        """, (token, now - RUN_LOCK_TTL))
+    return token if cur.rowcount == 1 else None
+
+def release_run_lock(token):
+    db().execute("UPDATE kv SET v='' WHERE k='run_lock' AND v=?", (token,))
+
+def run_in_progress():
+    held = kv_get("run_lock", "")
+    return bool(held) and float(held.split(":")[0]) >= time.time() - RUN_LOCK_TTL
+
+def request_run():
+    # picked up by the scheduler process (see claim_run_request)
+    kv_set("run_requested", datetime.utcnow().isoformat())
+
+def scheduler_heartbeat():
+    # written by the scheduler process every RUN_REQUEST_POLL seconds
+    kv_set("scheduler_heartbeat", time.time())
+
+def scheduler_alive():
+    # a few missed polls of slack so a busy scheduler isn't reported dead
+    return float(kv_get("scheduler_heartbeat", "0")) >= time.time() - max(3 * RUN_REQUEST_POLL, 15)
+
+def claim_run_request():
+    # atomically consume a pending request so only one scheduler process acts on it
+    cur = db().execute("UPDATE kv SET v='' WHERE k='run_requested' AND v != ''")
+    return cur.rowcount == 1
 
 def set_job_status(job_id, status, notes=""):
-    conn = sqlite3.connect(DB_PATH)
+    conn = db()
     c = conn.cursor()
     c.execute("UPDATE jobs SET status=?, notes=? WHERE job_id=?", (status, notes, job_id))
-    conn.commit()
-    conn.close()
+    invalidate_dashboard()
 
 def record_application(job_id, cover_text, resume_path, result):
-    conn = sqlite3.connect(DB_PATH)
+    conn = db()
     c = conn.cursor()
     c.execute("INSERT INTO applications (job_id,cover,resume_path,attempt_time,result) VALUES (?,?,?,?,?)",
               (job_id, cover_text, resume_path, datetime.utcnow().isoformat(), result))
-    conn.commit()
-    conn.close()
 
 # ---------- Local LLM adapter ----------
+_llm_sem = threading.BoundedSemaphore(LLM_CONCURRENCY)  # a local model usually serves one or two prompts at a time
+LLM_CACHE_VERSION = "2"  # bump to orphan cached text when response parsing changes (v1 stored mis-decoded streams)
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def llm_cache():
+    """
+    The on-disk completion cache, opened on first use so importing app doesn't create LLM_CACHE_DIR.
+    Persistent across runs; safe to share between threads.
+    """
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = Cache(LLM_CACHE_DIR)
+        return _llm_cache
+
+LLM_TEXT_KEYS = ("text", "generated", "content", "response", "token", "choices")
+SSE_FIELDS = ("event:", "id:", "retry:")
+
+def _llm_text(j):
+    # field names used by common local servers (this adapter, llama.cpp, Ollama, TGI, OpenAI-compatible)
+    token = j.get("token")
+    choice = (j.get("choices") or [{}])[0]
+    if not isinstance(choice, dict):
+        choice = {}
+    return (j.get("text") or j.get("generated") or j.get("content") or j.get("response")
+            or (token.get("text") if isinstance(token, dict) else token)
+            or choice.get("text") or (choice.get("delta") or {}).get("content")
+            or (choice.get("message") or {}).get("content") or "")
+
+def _read_llm_stream(r):
+    """
+    Joins a streamed completion: JSON lines, or SSE where only "data: {...}" payloads carry text
+    (comments, event/id/retry fields are skipped). Endpoints that ignore "stream" and answer
+    with a single JSON body are handled too. Chunks of an unknown shape are returned raw, like the
+    non-streaming path does, rather than silently dropped.
+    """
+    content_type = r.headers.get("Content-Type", "")
+    if content_type.startswith("application/json"):
+        j = r.json()
+        return _llm_text(j) or str(j)
+    sse = content_type.startswith("text/event-stream")
+    if "charset=" not in content_type.lower():
+        # without a charset requests yields bytes (x-ndjson) or guesses ISO-8859-1 (text/*); servers send UTF-8
+        r.encoding = "utf-8"
+    parts, unknown = [], []
+    for line in r.iter_lines(decode_unicode=True):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        if not line:
+            continue
+        if not parts and not unknown and (line.startswith((":", "data:")) or line.startswith(SSE_FIELDS)):
+            sse = True  # SSE served with a generic content type
+        if sse:
+            if not line.startswith("data:"):
+                continue  # ": comment", event:, id:, retry:
+            line = line[len("data:"):].strip()
+        if line == "[DONE]":
+            break
+        try:
+            chunk = json.loads(line)
+        except ValueError:
+            chunk = None
+        if not isinstance(chunk, dict):
+            parts.append(line + "\n")  # plain-text streaming; iter_lines strips the newline
+            continue
+        if any(k in chunk for k in LLM_TEXT_KEYS):
+            parts.append(_llm_text(chunk))
+        elif not ("done" in chunk or "stop" in chunk):
+            unknown.append(line)
+        if chunk.get("done") or chunk.get("stop"):
+            break
+    return "".join(parts) or "".join(unknown)
+
+def _llm_cache_key(prompt):
+    return hashlib.sha256((LLM_CACHE_VERSION + "\n" + LOCAL_LLM_ENDPOINT + "\n" + prompt).encode()).hexdigest()
+
 def local_llm_generate(prompt: str) -> str:
     """
     Hook to call your local model.
-    By default: calls LOCAL_LLM_ENDPOINT if provided (expects JSON {"prompt":...} -> {"text":...})
+    By default: calls LOCAL_LLM_ENDPOINT if provided (expects JSON {"prompt":...} -> {"text":...},
+    or a token stream when LLM_STREAM is on).
     Otherwise returns a simple stub.
     Replace this function to call your local model (e.g., local Flask model endpoint, or python function).
+    Successful (non-empty) endpoint responses are cached on disk for LLM_CACHE_TTL, so re-runs skip inference for jobs already seen.
     """
     if LOCAL_LLM_ENDPOINT:
+        key = _llm_cache_key(prompt)
+        cached = llm_cache().get(key)
+        if cached:
+            return cached
         try:
-            r = requests.post(LOCAL_LLM_ENDPOINT, json={"prompt": prompt, "max_tokens": 400}, timeout=30)
-            r.raise_for_status()
-            j = r.json()
-            return j.get("text") or j.get("generated") or str(j)
+            with _llm_sem:
+                if LLM_STREAM:
+                    # read timeout applies between chunks, so long generations don't hit it
+                    with SESSION.post(LOCAL_LLM_ENDPOINT, json={"prompt": prompt, "max_tokens": 400, "stream": True},
+                                      stream=True, timeout=(5, 30)) as r:
+                        r.raise_for_status()
+                        text = _read_llm_stream(r)
+                else:
+                    r = SESSION.post(LOCAL_LLM_ENDPOINT, json={"prompt": prompt, "max_tokens": 400}, timeout=30)
+                    r.raise_for_status()
+                    j = r.json()
+                    text = j.get("text") or j.get("generated") or str(j)
+            if not text.strip():
+                raise ValueError("empty completion")
+            llm_cache().set(key, text, expire=LLM_CACHE_TTL)
+            return text
         except Exception as e:
             print("LLM endpoint error:", e)
             return f"[LLM failure] Generated fallback for prompt: {prompt[:200]}"
     # fallback stub
     return f"Optimized cover for prompt (stub): {prompt[:300]}"
 
+def local_llm_generate_many(prompts: list) -> list:
+    """
+    Batched variant of local_llm_generate, returning texts in prompt order.
+    With LLM_BATCH on, uncached prompts go to LOCAL_LLM_ENDPOINT in one request
+    ({"prompts": [...]} -> {"texts": [...]} or a bare list), so servers with continuous batching can run them together.
+    Otherwise, or once the endpoint has shown it can't batch (remembered in kv), prompts are sent concurrently one by one.
+    """
+    if not LOCAL_LLM_ENDPOINT:
+        return [local_llm_generate(p) for p in prompts]
+    texts = [llm_cache().get(_llm_cache_key(p)) or None for p in prompts]
+    missing = [i for i, t in enumerate(texts) if t is None]
+    if LLM_BATCH and len(missing) > 1 and kv_get("llm_batch_unsupported") != LOCAL_LLM_ENDPOINT:
+        try:
+            with _llm_sem:
+                r = SESSION.post(LOCAL_LLM_ENDPOINT, json={"prompts": [prompts[i] for i in missing], "max_tokens": 400},
+                                 timeout=(5, 30 * len(missing)))
+            r.raise_for_status()
+            j = r.json()
+            batch = j if isinstance(j, list) else (j.get("texts") or j.get("results"))
+            if not isinstance(batch, list) or len(batch) != len(missing):
+                raise ValueError("endpoint did not return one text per prompt")
+            for i, item in zip(missing, batch):
+                text = (_llm_text(item) if isinstance(item, dict) else str(item)) or ""
+                if text.strip():
+                    texts[i] = text
+                    llm_cache().set(_llm_cache_key(prompts[i]), text, expire=LLM_CACHE_TTL)
+            # empty completions are retried one by one below instead of being kept
+            missing = [i for i in missing if texts[i] is None]
+        except Exception as e:
+            print("LLM batch request failed, falling back to single prompts:", e)
+            rejected = isinstance(e, requests.HTTPError) and e.response is not None and 400 <= e.response.status_code < 500
+            if rejected or isinstance(e, ValueError):
+                # the endpoint understood the request but not the batch contract; don't re-probe every run
+                kv_set("llm_batch_unsupported", LOCAL_LLM_ENDPOINT)
+    with ThreadPoolExecutor(max_workers=LLM_CONCURRENCY) as pool:
+        for i, text in zip(missing, pool.map(local_llm_generate, [prompts[i] for i in missing])):
+            texts[i] = text
+    return texts
+
 # ---------- Scraper (basic) ----------
-def search_indeed(role=JOB_ROLE, location=JOB_LOCATION):
+SCRAPE_HEADERS = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64)"}
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "64"))  # max in-flight requests overall
+SCRAPE_PER_HOST = int(os.getenv("SCRAPE_PER_HOST", "8"))  # max open connections per job board
+
+SCRAPE_RATE = float(os.getenv("SCRAPE_RATE", "1"))  # sustained requests/second per host
+SCRAPE_BURST = int(os.getenv("SCRAPE_BURST", "4"))  # requests allowed back-to-back before throttling
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_buckets = {}  # host -> (tokens, last refill time)
+
+async def throttle(host):
+    """
+    Per-host token bucket: waits until a request to host fits within SCRAPE_RATE / SCRAPE_BURST.
+    """
+    while True:
+        now = time.monotonic()
+        tokens, last = _buckets.get(host, (SCRAPE_BURST, now))
+        tokens = min(SCRAPE_BURST, tokens + (now - last) * SCRAPE_RATE)
+        if tokens >= 1:
+            _buckets[host] = (tokens - 1, now)
+            return
+        _buckets[host] = (tokens, now)
+        await asyncio.sleep((1 - tokens) / SCRAPE_RATE)
+
+def _is_retryable(exc):
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in RETRY_STATUSES
+    return isinstance(exc, (asyncio.TimeoutError, aiohttp.ClientConnectionError))
+
+_backoff = wait_exponential(multiplier=1, max=30)
+
+def _retry_after_or_backoff(retry_state):
+    # honour the server's Retry-After (seconds form) when it sends one, else back off exponentially
+    headers = getattr(retry_state.outcome.exception(), "headers", None) or {}
+    retry_after = headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), 60)
+    return _backoff(retry_state)
+
+@retry(wait=_retry_after_or_backoff, stop=stop_after_attempt(5), retry=retry_if_exception(_is_retryable), reraise=True)
+async def fetch(session, sem, url):
+    """
+    GET a page through the shared aiohttp session, bounded by the run's semaphore and the per-host rate limit.
+    429/5xx and timeouts are retried with backoff. Returns (status_code, body_text).
     """
-    Minimal Indeed-like scraping for demonstration:
-    - Builds a search URL and parses job cards.
+    await throttle(urlparse(url).netloc)
+    async with sem:
+        async with session.get(url, headers=SCRAPE_HEADERS, timeout=aiohttp.ClientTimeout(total=15)) as resp:
+            if resp.status in RETRY_STATUSES:
+                resp.raise_for_status()
+            return resp.status, await resp.text()
+
+# ---------- Card selectors (compiled once at import) ----------
+def _cls(name):
+    # XPath equivalent of the CSS ".name" class test
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def _text(nodes):
+    # first match's text, stripped like BeautifulSoup's get_text(strip=True); None if no match
+    if not nodes:
+        return None
+    return "".join(s.strip() for s in nodes[0].itertext())
+
+INDEED_CARDS = etree.XPath(f"//div[{_cls('jobsearch-SerpJobCard')}] | //div[{_cls('slider_container')}] | //a[{_cls('tapItem')}]")
+INDEED_TITLE = etree.XPath(f".//h2[{_cls('title')} or {_cls('jobTitle')}] | .//a[{_cls('jobtitle')}]")
+INDEED_COMPANY = etree.XPath(f".//span[{_cls('company')} or {_cls('companyName')}]")
+INDEED_LOCATION = etree.XPath(f".//div[{_cls('recJobLoc')} or {_cls('companyLocation')}] | .//span[{_cls('location')}]")
+INDEED_LINK = etree.XPath("(.//a)[1]/@href")  # first <a> only, as before; no href means no url
+INDEED_POSTED = etree.XPath(f".//span[{_cls('date')} or {_cls('postedDate')}]")
+
+NAUKRI_CARDS = etree.XPath(f"//*[{_cls('jobTuple')}]")
+NAUKRI_TITLE = etree.XPath(f".//a[{_cls('title')}]")
+NAUKRI_COMPANY = etree.XPath(f".//a[{_cls('subTitle')}]")
+NAUKRI_LOCATION = etree.XPath(f".//*[{_cls('job-search-location')}]//span")
+NAUKRI_LINK = etree.XPath(f".//a[{_cls('title')}]/@href")
+NAUKRI_POSTED = etree.XPath(f".//*[{_cls('type')}][ancestor-or-self::*[{_cls('jobTuple')}]]")
+
+def _is_recent(posted):
+    # filter "today" or "just posted"
+    posted = (posted or "").lower()
+    return "today" in posted or "just posted" in posted or "1 day" in posted
+
+def _job(title, company, loc_text, job_url):
+    job_id = (company + "|" + (title or "") + "|" + (job_url or ""))[:200]
+    return {
+        "job_id": job_id,
+        "title": title or "Unknown",
+        "company": company,
+        "location": loc_text,
+        "url": job_url,
+        "posted_date": datetime.utcnow().date().isoformat(),
+        "status": "new",
+        "notes": ""
+    }
+
+def parse_indeed(html, location):
+    """
+    Minimal Indeed-like parsing for demonstration:
+    - Parses job cards from a search results page.
     - Filters for 'today' in posted date.
     NOTE: selectors may break; update per site. This is a best-effort example.
     """
     results = []
-    q = role.replace(" ", "+")
-    loc = location.replace(" ", "+")
-    url = f"https://www.indeed.com/jobs?q={q}&l={loc}"
-    print("Searching:", url)
-    headers = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64)"}
-    resp = requests.get(url, headers=headers, timeout=15)
-    if resp.status_code != 200:
-        print("Search failed", resp.status_code)
+    if not html.strip():
         return results
-    soup = BeautifulSoup(resp.text, "html.parser")
-    cards = soup.select("div.jobsearch-SerpJobCard, div.slider_container, a.tapItem")
-    for c in cards:
-        # flexible extraction
-        title_tag = c.select_one("h2.title, h2.jobTitle")
-        title = title_tag.get_text(strip=True) if title_tag else (c.select_one("a.jobtitle").get_text(strip=True) if c.select_one("a.jobtitle") else None)
-        company_tag = c.select_one("span.company, span.companyName")
-        company = company_tag.get_text(strip=True) if company_tag else "Unknown"
-        loc_tag = c.select_one("div.recJobLoc, div.companyLocation, span.location")
-        loc_text = loc_tag.get_text(strip=True) if loc_tag else location
-        link_tag = c.select_one("a")
-        job_url = "https://www.indeed.com" + link_tag.get("href") if link_tag and link_tag.get("href", "").startswith("/") else (link_tag.get("href") if link_tag else None)
-        posted = ""
-        posted_tag = c.select_one("span.date, span.postedDate")
-        if posted_tag:
-            posted = posted_tag.get_text(strip=True)
-        # filter "today" or "just posted"
-        if posted and ("today" in posted.lower() or "just posted" in posted.lower() or "1 day" in posted.lower()):
-            job_id = (company + "|" + (title or "") + "|" + (job_url or "") )[:200]
-            results.append({
-                "job_id": job_id,
-                "title": title or "Unknown",
-                "company": company,
-                "location": loc_text,
-                "url": job_url,
-                "posted_date": datetime.utcnow().date().isoformat(),
-                "status": "new",
-                "notes": ""
-            })
+    tree = lxml.html.fromstring(html)
+    for c in INDEED_CARDS(tree):
+        # check the date first so old cards cost one lookup
+        if not _is_recent(_text(INDEED_POSTED(c))):
+            continue
+        # flexible extraction; h2 title preferred, a.jobtitle as fallback
+        titles = INDEED_TITLE(c)
+        title = _text([t for t in titles if t.tag == "h2"] or titles)
+        company = _text(INDEED_COMPANY(c)) or "Unknown"
+        loc_text = _text(INDEED_LOCATION(c)) or location
+        hrefs = INDEED_LINK(c)
+        href = hrefs[0] if hrefs else None
+        job_url = "https://www.indeed.com" + href if href and href.startswith("/") else href
+        results.append(_job(title, company, loc_text, job_url))
     return results
 
-def search_naukri(role=JOB_ROLE, location=JOB_LOCATION):
+def parse_naukri(html, location):
     """
-    Minimal Naukri-like scraping example (India). Update as needed.
+    Minimal Naukri-like parsing example (India). Update as needed.
     """
     results = []
+    if not html.strip():
+        return results
+    tree = lxml.html.fromstring(html)
+    for c in NAUKRI_CARDS(tree):
+        if not _is_recent(_text(NAUKRI_POSTED(c))):
+            continue
+        title = _text(NAUKRI_TITLE(c))
+        company = _text(NAUKRI_COMPANY(c)) or "Unknown"
+        loc_text = _text(NAUKRI_LOCATION(c)) or location
+        hrefs = NAUKRI_LINK(c)
+        job_url = hrefs[0] if hrefs else None
+        results.append(_job(title, company, loc_text, job_url))
+    return results
+
+async def search_indeed_async(session, sem, role=JOB_ROLE, location=JOB_LOCATION):
+    q = role.replace(" ", "+")
+    loc = location.replace(" ", "+")
+    url = f"https://www.indeed.com/jobs?q={q}&l={loc}"
+    print("Searching:", url)
+    status, html = await fetch(session, sem, url)
+    if status != 200:
+        print("Search failed", status)
+        return []
+    # parsing is CPU-bound; keep it off the event loop so the other board's download proceeds
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, parse_indeed, html, location)
+
+async def search_naukri_async(session, sem, role=JOB_ROLE, location=JOB_LOCATION):
     q = role.replace(" ", "-")
     loc = location.replace(" ", "-")
     url = f"https://www.naukri.com/{q}-jobs-in-{loc}"
     print("Searching:", url)
-    headers = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64)"}
     try:
-        resp = requests.get(url, headers=headers, timeout=15)
-        soup = BeautifulSoup(resp.text, "html.parser")
-        cards = soup.select("article.jobTuple, .jobTuple")
-        for c in cards:
-            title_tag = c.select_one("a.title")
-            title = title_tag.get_text(strip=True) if title_tag else None
-            company_tag = c.select_one("a.subTitle")
-            company = company_tag.get_text(strip=True) if company_tag else "Unknown"
-            loc_tag = c.select_one(".job-search-location span")
-            loc_text = loc_tag.get_text(strip=True) if loc_tag else location
-            link_tag = c.select_one("a.title")
-            job_url = link_tag.get("href") if link_tag else None
-            posted_tag = c.select_one(".jobTuple .type")
-            posted = posted_tag.get_text(strip=True) if posted_tag else ""
-            if posted and ("today" in posted.lower() or "just posted" in posted.lower() or "1 day" in posted.lower()):
-                job_id = (company + "|" + (title or "") + "|" + (job_url or ""))[:200]
-                results.append({
-                    "job_id": job_id,
-                    "title": title or "Unknown",
-                    "company": company,
-                    "location": loc_text,
-                    "url": job_url,
-                    "posted_date": datetime.utcnow().date().isoformat(),
-                    "status": "new",
-                    "notes": ""
-                })
+        status, html = await fetch(session, sem, url)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, parse_naukri, html, location)
     except Exception as e:
         print("Naukri search error:", e)
-    return results
+        return []
+
+# add new boards here; each entry is (name, async search function)
+SCRAPERS = [
+    ("indeed", search_indeed_async),
+    ("naukri", search_naukri_async),
+]
+
+async def run_scrapers(role=JOB_ROLE, location=JOB_LOCATION):
+    """
+    Scrape all boards in SCRAPERS concurrently, so a run takes roughly as long as the slowest site.
+    The connector and semaphore are created per call because asyncio.run() gives each run a fresh loop.
+    """
+    sem = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit_per_host=SCRAPE_PER_HOST)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        results = await asyncio.gather(*(search(session, sem, role, location) for _, search in SCRAPERS),
+                                       return_exceptions=True)
+    jobs = []
+    for (name, _), r in zip(SCRAPERS, results):
+        if isinstance(r, Exception):
+            print(f"{name} error:", r)
+            continue
+        jobs += r
+    return jobs
+
+# ---------- Apply logic (direct HTTP) ----------
+APPLY_FORM = "//form[.//input[@type='file'][@name]]"
+TEXT_INPUT_TYPES = ("", "text", "email", "tel")
+
+def _unfilled_fields(form):
+    """
+    Names of fields the applicant would have to type: required controls with no value,
+    and visible text/email/tel inputs left empty. We only know how to send the resume.
+    """
+    missing = []
+    for el in form.inputs:
+        name = el.get("name")
+        if not name or "disabled" in el.attrib:
+            continue
+        tag = el.tag.lower()
+        kind = (el.get("type") or "").lower() if tag == "input" else tag
+        if kind in ("hidden", "file", "submit", "image", "reset", "button"):
+            continue
+        if kind in ("checkbox", "radio"):
+            if "required" in el.attrib and not el.checked:
+                missing.append(name)
+            continue
+        if isinstance(el, lxml.html.SelectElement):
+            # el.value is a set-like MultipleSelectOptions for <select multiple>, a string otherwise
+            if "required" in el.attrib and not (el.value if el.multiple else (el.value or "").strip()):
+                missing.append(name)
+            continue
+        empty = not (el.value or "").strip()
+        if empty and ("required" in el.attrib or kind in TEXT_INPUT_TYPES):
+            missing.append(name)
+    return missing
+
+def try_http_apply(job, resume_path=RESUME_PATH):
+    """
+    Apply without a browser when the posting page has a plain multipart <form> with <input type='file'>
+    that needs nothing but the resume: resume goes in the first file field, hidden/default inputs are sent as-is.
+    Returns a result dict on success, or None when no such form exists, it has fields we can't fill,
+    or the POST is not 2xx / re-renders the form, so the caller can fall back to Selenium.
+    """
+    url = job.get("url")
+    try:
+        resp = SESSION.get(url, headers=SCRAPE_HEADERS, timeout=15)
+        if resp.status_code != 200:
+            return None
+        tree = lxml.html.fromstring(resp.text, base_url=resp.url)
+        forms = tree.xpath(APPLY_FORM)
+        if not forms:
+            return None
+        form = forms[0]
+        if (form.method or "GET").upper() != "POST" or (form.get("onsubmit") and not form.get("action")):
+            # GET forms can't carry a file and JS-submitted forms need the browser
+            return None
+        if (form.get("enctype") or "").lower() != "multipart/form-data":
+            # a file input without multipart encoding is uploaded by script, not by the form
+            return None
+        missing = _unfilled_fields(form)
+        if missing:
+            print("HTTP apply skipped; form needs:", ", ".join(missing))
+            return None
+        action = form.action or resp.url
+        file_field = form.xpath(".//input[@type='file'][@name]")[0].name
+        mime = mimetypes.guess_type(resume_path)[0] or "application/octet-stream"
+        with open(resume_path, "rb") as fh:
+            files = {file_field: (os.path.basename(resume_path), fh, mime)}
+            post = SESSION.post(action, data=form.form_values(), files=files, headers=SCRAPE_HEADERS, timeout=30)
+        if not post.ok:
+            print("HTTP apply rejected", post.status_code, action)
+            return None
+        if post.text.strip() and lxml.html.fromstring(post.text).xpath(APPLY_FORM):
+            # same upload form came back: most likely validation errors, not a submitted application
+            print("HTTP apply returned the form again", action)
+            return None
+        return {"result": "applied", "detail": f"http-form-post {post.status_code} {action}"}
+    except Exception as e:
+        print("HTTP apply error:", e)
+        return None
 
 # ---------- Apply logic (selenium) ----------
+_driver = None
+_driver_lock = threading.Lock()  # one browser, one page at a time
+
+def get_driver():
+    """
+    Lazily start the shared Chrome instance; callers must hold _driver_lock.
+    """
+    global _driver
+    if _driver is None:
+        opts = Options()
+        if APPLY_MODE == "auto":
+            opts.add_argument("--headless=new")
+        opts.add_argument("--no-sandbox")
+        opts.add_argument("--disable-dev-shm-usage")
+        if SELENIUM_DRIVER_PATH:
+            _driver = webdriver.Chrome(executable_path=SELENIUM_DRIVER_PATH, options=opts)  # selenium 4 may warn
+        else:
+            _driver = webdriver.Chrome(options=opts)
+    return _driver
+
+def close_driver():
+    """
+    Quit the shared Chrome instance if one was started (called once at the end of a run).
+    """
+    with _driver_lock:
+        _quit_driver()
+
+def _quit_driver():
+    global _driver
+    if _driver is not None:
+        try:
+            _driver.quit()
+        except:
+            pass
+        _driver = None
+
 def apply_to_job(job, resume_path=RESUME_PATH):
     """
     Try to perform a simple apply:
+    - First try a direct HTTP form POST (see try_http_apply).
     - If the job posting has a simple form with <input type='file'>, upload resume and submit.
     - Otherwise, return 'queued' or 'manual required'.
     This is intentionally conservative.
@@ -225,56 +687,125 @@ def apply_to_job(job, resume_path=RESUME_PATH):
     url = job.get("url")
     if not url:
         return {"result": "no_url"}
-    # Setup selenium
-    opts = Options()
-    if APPLY_MODE == "auto":
-        opts.add_argument("--headless=new")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    driver = None
-    try:
-        if SELENIUM_DRIVER_PATH:
-            driver = webdriver.Chrome(executable_path=SELENIUM_DRIVER_PATH, options=opts)  # selenium 4 may warn
-        else:
-            driver = webdriver.Chrome(options=opts)
-        driver.get(url)
-        time.sleep(2)
-        # Try to find file input
+    # Fast path: plain form POST; Selenium only when that isn't possible
+    http_result = try_http_apply(job, resume_path)
+    if http_result:
+        return http_result
+    with _driver_lock:
         try:
-            file_input = driver.find_element(By.XPATH, "//input[@type='file']")
-            # upload
-            file_input.send_keys(os.path.abspath(resume_path))
-            time.sleep(1)
-            # Attempt to find submit/apply button
-            btn = None
-            for xpath in ["//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apply')]", "//input[@type='submit']"]:
-                try:
-                    btn = driver.find_element(By.XPATH, xpath)
-                    if btn:
-                        btn.click()
-                        break
-                except:
-                    pass
+            driver = get_driver()
+            # reuse the browser, but don't leak one site's session into the next
+            driver.delete_all_cookies()
+            driver.get(url)
             time.sleep(2)
-            driver.quit()
-            return {"result": "applied", "detail": "file-uploaded-and-clicked"}
-        except Exception as e:
-            driver.quit()
-            return {"result": "manual_required", "detail": f"no file input or error: {e}"}
-    except Exception as e:
-        if driver:
+            # Try to find file input
             try:
-                driver.quit()
-            except:
-                pass
-        print("Selenium error:", e)
-        return {"result": "selenium_error", "detail": str(e)}
+                file_input = driver.find_element(By.XPATH, "//input[@type='file']")
+                # upload
+                file_input.send_keys(os.path.abspath(resume_path))
+                time.sleep(1)
+                # Attempt to find submit/apply button
+                btn = None
+                for xpath in ["//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apply')]", "//input[@type='submit']"]:
+                    try:
+                        btn = driver.find_element(By.XPATH, xpath)
+                        if btn:
+                            btn.click()
+                            break
+                    except:
+                        pass
+                time.sleep(2)
+                return {"result": "applied", "detail": "file-uploaded-and-clicked"}
+            except Exception as e:
+                return {"result": "manual_required", "detail": f"no file input or error: {e}"}
+        except Exception as e:
+            # browser failed to start or crashed; drop it so the next job gets a fresh one
+            _quit_driver()
+            print("Selenium error:", e)
+            return {"result": "selenium_error", "detail": str(e)}
 
 # ---------- Gmail checker (IMAP) ----------
+GMAIL_IDLE_TIMEOUT = 1740  # seconds; re-issue IDLE before Gmail drops it (~29 min)
+
+_gmail_watcher = None
+
+def _header_text(value):
+    # ENVELOPE fields are raw (possibly RFC 2047 encoded) bytes
+    if not value:
+        return ""
+    raw = value.decode("utf-8", errors="ignore") if isinstance(value, bytes) else str(value)
+    try:
+        return str(make_header(decode_header(raw)))
+    except Exception:
+        return raw
+
+def _envelope_from(envelope):
+    parts = []
+    for addr in envelope.from_ or ():
+        mailbox = _header_text(addr.mailbox) + ("@" + _header_text(addr.host) if addr.host else "")
+        parts.append(f"{_header_text(addr.name)} <{mailbox}>".strip())
+    return ", ".join(parts)
+
+def match_replies(client, messages):
+    """
+    Fetches envelopes for the given message UIDs and matches sender or subject to companies
+    in our jobs table, updating status to 'replied' if matched.
+    """
+    resp = client.fetch(messages, ['ENVELOPE'])
+    # load open jobs once per batch, grouped by company, instead of per message
+    conn = db()
+    c = conn.cursor()
+    c.execute("SELECT job_id, company FROM jobs WHERE status NOT IN ('replied','hired','closed')")
+    companies = {}
+    for job_id, company in c.fetchall():
+        if company:
+            companies.setdefault(company.lower(), []).append(job_id)
+    if not companies:
+        return
+    # one automaton over all company names: each message is scanned once, however many jobs are open
+    automaton = ahocorasick.Automaton()
+    for company in companies:
+        automaton.add_word(company, company)
+    automaton.make_automaton()
+    for msgid, data in resp.items():
+        envelope = data.get(b'ENVELOPE')
+        if envelope is None:
+            continue
+        frm = _envelope_from(envelope)
+        subj = _header_text(envelope.subject)
+        haystack = frm.lower() + " " + subj.lower()
+        for company in {company for _, company in automaton.iter(haystack)}:
+            for job_id in companies.pop(company, ()):  # replied jobs drop out of later matches
+                print("Matched email -> updating job:", job_id, company)
+                set_job_status(job_id, "replied", notes=f"Email matched: {subj} from {frm}")
+
+def sync_replies(client, folder_info):
+    """
+    Matches only messages newer than the last UID we processed (persisted in kv), then stores the new high-water mark.
+    Falls back to the last week of mail on first use or when the mailbox's UIDVALIDITY changes.
+    """
+    uidvalidity = str(folder_info.get(b'UIDVALIDITY', ""))
+    last_uid = int(kv_get("gmail_last_uid", "0"))
+    if kv_get("gmail_uidvalidity") != uidvalidity:
+        last_uid = 0
+    if last_uid:
+        messages = client.search(['UID', f'{last_uid + 1}:*'])
+    else:
+        since = (datetime.utcnow() - timedelta(days=7)).date()  # check recent week
+        messages = client.search(['SINCE', since])
+    # "*" always returns the newest message, so drop anything already seen
+    messages = [m for m in messages if m > last_uid]
+    if messages:
+        match_replies(client, messages)
+        last_uid = max(messages)
+    kv_set("gmail_last_uid", last_uid)
+    kv_set("gmail_uidvalidity", uidvalidity)
+    return messages
+
 def check_gmail_and_update():
     """
-    Connects to Gmail IMAP, checks inbox for emails received today,
-    matches sender or subject to companies in our jobs table, updates status to 'replied' if matched.
+    One-shot check: connects to Gmail IMAP and matches replies received since the last check.
+    Used by --run-once; long-running processes use the IDLE watcher instead.
     """
     if not (GMAIL_EMAIL and GMAIL_PASSWORD):
         print("Gmail credentials not set; skipping email check.")
@@ -282,159 +813,247 @@ def check_gmail_and_update():
     print("Checking Gmail for replies...")
     with IMAPClient(GMAIL_IMAP) as client:
         client.login(GMAIL_EMAIL, GMAIL_PASSWORD)
-        client.select_folder("INBOX")
-        since = (datetime.utcnow() - timedelta(days=7)).date().isoformat()  # check recent week
-        messages = client.search(['SINCE', since])
-        # fetch headers
-        if not messages:
-            print("No messages found.")
-            return
-        resp = client.fetch(messages, ['ENVELOPE', 'BODY.PEEK[HEADER.FIELDS (FROM SUBJECT)]'])
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        for msgid, data in resp.items():
-            envelope = data.get(b'ENVELOPE')
-            subject_raw = b""
-            frm = ""
-            try:
-                hdr = data.get(b'BODY[HEADER.FIELDS (FROM SUBJECT)]').decode('utf-8', errors='ignore')
-                # parse simple
-                for line in hdr.splitlines():
-                    if line.lower().startswith("subject:"):
-                        subject_raw = line[len("subject:"):].strip()
-                    if line.lower().startswith("from:"):
-                        frm = line[len("from:"):].strip()
-                subj = subject_raw
-            except Exception:
-                subj = ""
-            # match against companies in jobs table
-            c2 = conn.cursor()
-            c2.execute("SELECT job_id, company, status FROM jobs WHERE status NOT IN ('replied','hired','closed')")
-            rows = c2.fetchall()
-            for job_id, company, status in rows:
-                if company and (company.lower() in (frm.lower() + " " + subj.lower())):
-                    print("Matched email -> updating job:", job_id, company)
-                    set_job_status(job_id, "replied", notes=f"Email matched: {subj} from {frm}")
-        conn.close()
+        folder_info = client.select_folder("INBOX")
+        if not sync_replies(client, folder_info):
+            print("No new messages found.")
         client.logout()
 
+def watch_gmail():
+    """
+    Keeps one IMAP connection open and waits in IDLE for new mail, so replies are matched
+    as they arrive instead of once per run. Reconnects (with a catch-up sync) if the connection drops.
+    """
+    while True:
+        try:
+            with IMAPClient(GMAIL_IMAP) as client:
+                client.login(GMAIL_EMAIL, GMAIL_PASSWORD)
+                folder_info = client.select_folder("INBOX")
+                sync_replies(client, folder_info)
+                print("Gmail watcher idling...")
+                while True:
+                    client.idle()
+                    responses = client.idle_check(timeout=GMAIL_IDLE_TIMEOUT)
+                    client.idle_done()
+                    if any(r[1] == b'EXISTS' for r in responses if len(r) > 1):
+                        sync_replies(client, folder_info)
+                    # otherwise timeout or flag change; loop re-issues IDLE
+        except Exception as e:
+            print("Gmail watcher error (reconnecting in 30s):", e)
+            time.sleep(30)
+
+def start_gmail_watcher():
+    """
+    Starts the IDLE watcher in a daemon thread (once per process).
+    """
+    global _gmail_watcher
+    if not (GMAIL_EMAIL and GMAIL_PASSWORD):
+        print("Gmail credentials not set; reply watcher disabled.")
+        return
+    if _gmail_watcher is None:
+        _gmail_watcher = threading.Thread(target=watch_gmail, name="gmail-idle", daemon=True)
+        _gmail_watcher.start()
+
 # ---------- Orchestration ----------
+def build_prompt(title, company):
+    return f"Optimize applicant resume and generate a short cover letter (3 bullets + 3-line intro) for job: {title} at {company}. Base resume: (local file: {RESUME_PATH})"
+
+def process_job(row, cover_text):
+    """
+    Attempt the apply (in auto mode) for one job row whose cover letter is already generated.
+    Runs in a worker thread, so it only does network work and returns what to write:
+    (job_id, cover_text, application_result, new_status, notes).
+    """
+    job_id, title, company, url, status = row
+    job = {"job_id": job_id, "title": title, "company": company, "url": url}
+    if APPLY_MODE == "auto":
+        result = apply_to_job(job, resume_path=RESUME_PATH)
+        if result.get("result") == "applied":
+            return job_id, cover_text, str(result), "applied", str(result)
+        elif result.get("result") == "manual_required":
+            return job_id, cover_text, str(result), "queued_manual", result.get("detail","")
+        else:
+            return job_id, cover_text, str(result), "error", str(result)
+    # queue for manual approval
+    return job_id, cover_text, "queued_for_manual", "queued_manual", "Awaiting manual approval to apply"
+
 def run_full_cycle():
+    # the lock lives in the DB, so overlapping runs are refused across threads and processes alike
+    token = acquire_run_lock()
+    if token is None:
+        print("Run already in progress; skipping.")
+        return
+    try:
+        _run_full_cycle()
+    finally:
+        release_run_lock(token)
+        invalidate_dashboard()
+
+def _run_full_cycle():
     print("Starting run:", datetime.utcnow().isoformat())
     # 1. search sites
-    jobs_found = []
-    try:
-        jobs_found += search_indeed(JOB_ROLE, JOB_LOCATION)
-    except Exception as e:
-        print("indeed error:", e)
     try:
-        jobs_found += search_naukri(JOB_ROLE, JOB_LOCATION)
+        jobs_found = asyncio.run(run_scrapers(JOB_ROLE, JOB_LOCATION))
     except Exception as e:
-        print("naukri error:", e)
+        print("scrape error:", e)
+        jobs_found = []
 
     # 2. upsert jobs
-    for j in jobs_found:
-        add_or_update_job(j)
+    add_or_update_jobs(jobs_found)
 
     # 3. For each new job, generate optimized cover/resume tweak and attempt apply (depending on APPLY_MODE)
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT job_id, title, company, url, status FROM jobs WHERE status='new'")
-    rows = c.fetchall()
-    for job_id, title, company, url, status in rows:
-        job = {"job_id": job_id, "title": title, "company": company, "url": url}
-        prompt = f"Optimize applicant resume and generate a short cover letter (3 bullets + 3-line intro) for job: {title} at {company}. Base resume: (local file: {RESUME_PATH})"
-        cover_text = local_llm_generate(prompt)
-        # store cover + record attempt
-        if APPLY_MODE == "auto":
-            result = apply_to_job(job, resume_path=RESUME_PATH)
-            record_application(job_id, cover_text, RESUME_PATH, str(result))
-            if result.get("result") == "applied":
-                set_job_status(job_id, "applied", notes=str(result))
-            elif result.get("result") == "manual_required":
-                set_job_status(job_id, "queued_manual", notes=result.get("detail",""))
-            else:
-                set_job_status(job_id, "error", notes=str(result))
-        else:
-            # queue for manual approval
-            record_application(job_id, cover_text, RESUME_PATH, "queued_for_manual")
-            set_job_status(job_id, "queued_manual", notes="Awaiting manual approval to apply")
-    conn.close()
-
-    # 4. Check Gmail for replies and update statuses
     try:
-        check_gmail_and_update()
-    except Exception as e:
-        print("Email check error:", e)
+        conn = db()
+        c = conn.cursor()
+        c.execute("SELECT job_id, title, company, url, status FROM jobs WHERE status='new'")
+        rows = c.fetchall()
+        # all cover letters in one LLM round trip, then the applies run in the pool; DB writes stay on this thread
+        covers = local_llm_generate_many([build_prompt(title, company) for _, title, company, _, _ in rows])
+        with ThreadPoolExecutor(max_workers=APPLY_WORKERS) as pool:
+            futures = {pool.submit(process_job, row, cover): row[0] for row, cover in zip(rows, covers)}
+            # record each apply as it finishes; one failure must not discard the others' results
+            for future in as_completed(futures):
+                try:
+                    job_id, cover_text, result, status, notes = future.result()
+                    record_application(job_id, cover_text, RESUME_PATH, result)
+                    set_job_status(job_id, status, notes=notes)
+                except Exception as e:
+                    print("Failed to record job", futures[future], ":", e)
+
+        # 4. Check Gmail for replies and update statuses (the IDLE watcher already does this when running)
+        if _gmail_watcher is None:
+            try:
+                check_gmail_and_update()
+            except Exception as e:
+                print("Email check error:", e)
+    finally:
+        # never leave the shared Chrome running between runs
+        close_driver()
 
     print("Run finished:", datetime.utcnow().isoformat())
 
 # ---------- Flask Dashboard & Endpoints ----------
 app = Flask(__name__)
 
+DASHBOARD_HTML = """
+<html><head><title>AI Job Agent Dashboard</title></head><body>
+<h1>AI Job Agent Dashboard</h1>
+<form action="/run_now" method="post"><button type="submit">Run Now</button></form>
+<table border="1" cellpadding="6" cellspacing="0">
+<tr><th>Job ID</th><th>Title</th><th>Company</th><th>Location</th><th>Posted</th><th>Status</th><th>Notes</th></tr>
+{% for j in jobs %}
+  <tr>
+    <td>{{ j[0] }}</td>
+    <td>{{ j[1] }}</td>
+    <td>{{ j[2] }}</td>
+    <td>{{ j[3] }}</td>
+    <td>{{ j[4] }}</td>
+    <td>{{ j[5] }}</td>
+    <td>{{ j[6] }}</td>
+  </tr>
+{% endfor %}
+</table>
+<p>Apply mode: <strong>{{ apply_mode }}</strong></p>
+<p>To run daily automatically, set up a cron job: <code>python3 app.py --run-once</code> or use the scheduler below.</p>
+</body></html>
+"""
+DASHBOARD_TEMPLATE = app.jinja_env.from_string(DASHBOARD_HTML)  # parsed once, not per request
+DASHBOARD_TTL = float(os.getenv("DASHBOARD_TTL", "10"))  # seconds a rendered dashboard is reused
+
+_dashboard_cache = {"html": None, "at": 0.0}
+_dashboard_lock = threading.Lock()
+
+def invalidate_dashboard():
+    """
+    Drop the cached dashboard page; called whenever job rows change.
+    """
+    with _dashboard_lock:
+        _dashboard_cache["html"] = None
+
 @app.route("/")
 def index():
-    # simple HTML dashboard
-    conn = sqlite3.connect(DB_PATH)
+    # simple HTML dashboard, re-rendered at most every DASHBOARD_TTL seconds
+    with _dashboard_lock:
+        if _dashboard_cache["html"] is not None and time.monotonic() - _dashboard_cache["at"] < DASHBOARD_TTL:
+            return _dashboard_cache["html"]
+    conn = db()
     c = conn.cursor()
     c.execute("SELECT job_id,title,company,location,posted_date,status,notes FROM jobs ORDER BY posted_date DESC LIMIT 200")
     jobs = c.fetchall()
-    conn.close()
-    html = """
-    <html><head><title>AI Job Agent Dashboard</title></head><body>
-    <h1>AI Job Agent Dashboard</h1>
-    <form action="/run_now" method="post"><button type="submit">Run Now</button></form>
-    <table border="1" cellpadding="6" cellspacing="0">
-    <tr><th>Job ID</th><th>Title</th><th>Company</th><th>Location</th><th>Posted</th><th>Status</th><th>Notes</th></tr>
-    {% for j in jobs %}
-      <tr>
-        <td>{{ j[0] }}</td>
-        <td>{{ j[1] }}</td>
-        <td>{{ j[2] }}</td>
-        <td>{{ j[3] }}</td>
-        <td>{{ j[4] }}</td>
-        <td>{{ j[5] }}</td>
-        <td>{{ j[6] }}</td>
-      </tr>
-    {% endfor %}
-    </table>
-    <p>Apply mode: <strong>{{ apply_mode }}</strong></p>
-    <p>To run daily automatically, set up a cron job: <code>python3 app.py --run-once</code> or use the scheduler below.</p>
-    </body></html>
-    """
-    return render_template_string(html, jobs=jobs, apply_mode=APPLY_MODE)
+    html = DASHBOARD_TEMPLATE.render(jobs=jobs, apply_mode=APPLY_MODE)
+    with _dashboard_lock:
+        _dashboard_cache["html"] = html
+        _dashboard_cache["at"] = time.monotonic()
+    return html
 
 @app.route("/run_now", methods=["POST"])
 def run_now():
-    run_full_cycle()
-    return jsonify({"ok": True, "message": "Run triggered"})
+    # answer immediately; the run happens on the scheduler, never on a web worker
+    if scheduler.running:
+        # dev server: the scheduler lives in this process
+        scheduler.add_job(run_full_cycle, id="run_now", replace_existing=True)
+    elif scheduler_alive():
+        # WSGI workers: leave a request for the single `app.py --no-server` process
+        request_run()
+    else:
+        # nobody would pick the request up; say so instead of queueing it forever
+        return jsonify({"ok": False, "queued": False,
+                        "message": "No scheduler process is running; start `python3 app.py --no-server`"}), 503
+    return jsonify({"ok": True, "queued": True, "message": "Run queued"}), 202
+
+@app.route("/status", methods=["GET"])
+def status():
+    conn = db()
+    c = conn.cursor()
+    c.execute("SELECT MAX(attempt_time) FROM applications")
+    last_attempt = c.fetchone()[0]
+    return jsonify({"running": run_in_progress(), "requested": bool(kv_get("run_requested", "")),
+                    "scheduler_alive": scheduler.running or scheduler_alive(), "last_application_at": last_attempt})
 
 @app.route("/applications", methods=["GET"])
 def list_applications():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db()
     c = conn.cursor()
     c.execute("SELECT job_id,cover,resume_path,attempt_time,result FROM applications ORDER BY attempt_time DESC LIMIT 200")
     rows = c.fetchall()
-    conn.close()
     return jsonify([{"job_id":r[0],"cover":r[1],"resume":r[2],"time":r[3],"result":r[4]} for r in rows])
 
 # ---------- Scheduler (optional background if you run the script persistently) ----------
-scheduler = BackgroundScheduler()
-scheduler.add_job(run_full_cycle, 'interval', hours=24, next_run_time=datetime.utcnow() + timedelta(seconds=5))
-scheduler.start()
+scheduler = BackgroundScheduler()  # created at import so /run_now can queue onto it; started only by start_scheduler()
+
+def start_scheduler():
+    """
+    Registers the daily run and starts the scheduler thread (once per process).
+    Skipped in the Flask reloader's watcher process, which would otherwise schedule a second copy.
+    """
+    if scheduler.running:
+        return
+    if app.debug and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        return
+    scheduler.add_job(run_full_cycle, 'interval', hours=24, next_run_time=datetime.utcnow() + timedelta(seconds=5))
+    scheduler.add_job(poll_run_requests, 'interval', seconds=RUN_REQUEST_POLL)
+    scheduler.start()
+    scheduler_heartbeat()
+
+def poll_run_requests():
+    # /run_now from a WSGI worker only records a request; this schedules it in the scheduler process
+    scheduler_heartbeat()
+    if claim_run_request():
+        scheduler.add_job(run_full_cycle, id="run_now", replace_existing=True)
 
 # ---------- CLI ----------
 if __name__ == "__main__":
-    init_db()
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--run-once", action="store_true", help="Run scraping + apply once and exit")
     parser.add_argument("--no-server", action="store_true", help="Do not start the Flask server")
     args = parser.parse_args()
+    init_db()
     if args.run_once:
         run_full_cycle()
         print("Completed run-once.")
         exit(0)
+    start_scheduler()
+    start_gmail_watcher()
     if args.no_server:
         # run scheduler only
         print("Scheduler started (runs every 24h). Press Ctrl+C to exit.")
@@ -444,6 +1063,5 @@ if __name__ == "__main__":
         except KeyboardInterrupt:
             print("Exiting.")
     else:
-        init_db()
         # start Flask app (dashboard) and scheduler runs in background
         app.run(host="0.0.0.0", port=5000, debug=False)
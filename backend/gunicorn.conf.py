@@ -0,0 +1,28 @@
+"""
+Gunicorn settings for serving the dashboard with several threaded workers:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Workers only serve HTTP. Run the daily scheduler and Gmail watcher in exactly one
+separate process so they are not duplicated per worker:
+
+    python3 app.py --no-server
+
+POST /run_now in a worker only records a request in the DB; that process picks it
+up within RUN_REQUEST_POLL seconds. If its heartbeat is missing, /run_now returns 503. Runs are serialised by a lock row in the DB,
+so /status reports the same state whichever worker answers.
+"""
+
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_WORKERS", "4"))
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", "8"))
+timeout = 120
+
+
+def post_worker_init(worker):
+    # tables/indexes are created with IF NOT EXISTS, so every worker can safely do this
+    from app import init_db
+    init_db()